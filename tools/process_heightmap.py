@@ -19,12 +19,26 @@ assets/terrain/tiles/
 ├── tile_index.json # Metadata for all tiles (new format)
 └── tileset.json    # Backward-compatible metadata
 
+With --shard-rows, each LOD directory instead holds one row_<y>.bin per tile
+row: the row's tile records (header + data) back to back, located through the
+"offset"/"length" fields of each tile's metadata. No flat root tiles are
+written in that mode; tileset.json points into the lod0 shards.
+
+With --stub-uniform, tiles whose pixels all share one value (open ocean,
+off-map padding) are stored as an 8-byte stub record instead: '<HHHH' 0xFFFF,
+width, height, height value. A full record starts with its width, which never
+exceeds 512, so the leading 0xFFFF cannot occur there. Their metadata carries
+"constant": true and "value" so loaders can fill the tile without reading it.
+
 Usage:
-    python3 process_heightmap.py [input_path] [output_dir] [--no-lod]
+    python3 process_heightmap.py [input_path] [output_dir] [--no-lod] [--shard-rows] [--stub-uniform]
 
 Example:
     python3 process_heightmap.py ../src_assets/World_elevation_map.png ../assets/terrain/tiles/
 
+Optional: opencv-python (or numba) speeds up LOD downsampling and orjson speeds
+up metadata serialization when installed.
+
 Requirements: 8.1
 """
 
@@ -33,6 +47,8 @@ import sys
 import json
 import struct
 import math
+import shutil
+from multiprocessing import Pool, get_start_method, shared_memory
 from pathlib import Path
 
 try:
@@ -53,15 +69,43 @@ except ImportError:
         print("Install with: pip3 install Pillow numpy scipy")
         sys.exit(1)
 
-TILE_SIZE = 512  # Pixels per tile at LOD 0
-MAX_LOD_LEVELS = 4  # LOD 0-3
+try:
+    import cv2
+    cv2.setNumThreads(os.cpu_count() or 1)
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-def process_heightmap(input_path: str, output_dir: str, generate_lod: bool = True) -> None:
+TILE_SIZE = 512  # Pixels per tile at LOD 0
+MAX_LOD_LEVELS = 4  # LOD 0-3
+PARALLEL_MIN_TILES = 64  # Below this many tiles, pool startup costs more than it saves
+TILE_HEADER_SIZE = 4  # '<HH' width, height
+UNIFORM_TILE_MARKER = 0xFFFF  # Leading field of a stub record, where a full record has its width
+UNIFORM_TILE_SIZE = 8  # '<HHHH' marker, width, height, value
+TILE_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# Per-process tile worker state (set once per worker by _init_tile_worker)
+_worker_data = None
+_worker_lut = None  # uint8 level -> normalized uint16 height
+_worker_stub_uniform = False
+_worker_out16 = None  # flat uint16 TILE_SIZE * TILE_SIZE quantized output buffer
+_worker_shm = None  # SharedMemory block backing _worker_data under spawn/forkserver
+
+
+def process_heightmap(input_path: str, output_dir: str, generate_lod: bool = True,
+                      shard_rows: bool = False, stub_uniform: bool = False) -> None:
     print(f"HeightmapTileProcessor: Starting multi-LOD tile generation...")
     print(f"  Input: {input_path}")
     print(f"  Output: {output_dir}")
     print(f"  Generate LOD levels: {generate_lod}")
+    print(f"  Row shards: {shard_rows}")
+    print(f"  Stub uniform tiles: {stub_uniform}")
 
     # Verify input exists
     if not os.path.exists(input_path):
@@ -82,25 +126,27 @@ def process_heightmap(input_path: str, output_dir: str, generate_lod: bool = Tru
         print("  Converting to grayscale...")
         img = img.convert('L')
 
-    # Convert to numpy array (float32 for precision)
-    data = np.array(img, dtype=np.float32) / 255.0
-
-    # Find min/max values
+    # Find min/max values (as 0-255 levels; metadata keeps the 0-1 scale).
+    # PIL scans its own buffer, so no numpy array is needed for this.
     print("Scanning for min/max elevation values...")
-    min_value = float(np.min(data))
-    max_value = float(np.max(data))
+    min_level, max_level = img.getextrema()
+    min_value = min_level / 255.0
+    max_value = max_level / 255.0
     print(f"  Value range: {min_value:.4f} to {max_value:.4f}")
 
+    # Keep the source at its native 8-bit precision; normalization happens per tile
+    data = np.asarray(img, dtype=np.uint8)
+    del img
+
     # Calculate tile grid for LOD 0
     tiles_x = math.ceil(width / TILE_SIZE)
     tiles_y = math.ceil(height / TILE_SIZE)
     print(f"LOD 0 tile grid: {tiles_x} x {tiles_y} ({tiles_x * tiles_y} total tiles)")
 
-    # Create LOD directories
-    if generate_lod:
-        for lod in range(MAX_LOD_LEVELS):
-            lod_dir = os.path.join(output_dir, f"lod{lod}")
-            os.makedirs(lod_dir, exist_ok=True)
+    # Create LOD directories (lod0 is always needed, flat tiles link into it)
+    for lod in range(MAX_LOD_LEVELS if generate_lod else 1):
+        lod_dir = os.path.join(output_dir, f"lod{lod}")
+        os.makedirs(lod_dir, exist_ok=True)
 
     # Initialize metadata
     metadata = {
@@ -115,6 +161,7 @@ def process_heightmap(input_path: str, output_dir: str, generate_lod: bool = Tru
         "mariana_depth": -10994.0,
         "everest_height": 8849.0,
         "lod_levels": MAX_LOD_LEVELS if generate_lod else 1,
+        "sharded": shard_rows,
         "tiles": {},
         "lod_tiles": {}
     }
@@ -123,42 +170,43 @@ def process_heightmap(input_path: str, output_dir: str, generate_lod: bool = Tru
     for lod in range(MAX_LOD_LEVELS if generate_lod else 1):
         metadata["lod_tiles"][str(lod)] = {}
 
-    value_range = max_value - min_value if max_value > min_value else 1.0
-
-    # Pre-generate downsampled versions of the full image for each LOD level
-    # This is MUCH faster than downsampling each tile individually
-    lod_images = {0: data}
-    if generate_lod:
-        print("Pre-generating LOD images...")
-        for lod in range(1, MAX_LOD_LEVELS):
-            scale = 1 << lod
-            new_h = max(height // scale, 1)
-            new_w = max(width // scale, 1)
-            
-            # Use PIL for fast high-quality downsampling
-            pil_img = Image.fromarray((data * 255).astype(np.uint8))
-            pil_img = pil_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            lod_images[lod] = np.array(pil_img, dtype=np.float32) / 255.0
-            print(f"  LOD {lod}: {new_w} x {new_h}")
-
-    # Process tiles at each LOD level
-    if generate_lod:
-        for lod in range(MAX_LOD_LEVELS):
-            process_lod_level_fast(lod_images[lod], lod, tiles_x, tiles_y, width, height, 
-                                  min_value, value_range, output_dir, metadata)
-    else:
-        process_lod_level_fast(data, 0, tiles_x, tiles_y, width, height,
-                              min_value, value_range, output_dir, metadata)
-
-    # Generate flat tiles for backward compatibility (LOD 0 tiles in root)
-    print("Generating backward-compatible flat tiles...")
-    process_flat_tiles(data, tiles_x, tiles_y, width, height, 
-                      min_value, value_range, output_dir, metadata)
+    level_range = max_level - min_level if max_level > min_level else 1
+
+    # The source only has 256 possible levels, so precompute the whole
+    # normalize + quantize step as a uint8 -> uint16 lookup table. Integer
+    # round-half-up division is exact, so every level inside the image's
+    # min/max lands in 0-65535 with no float rounding to clip; only the unused
+    # levels outside that range need bounding, done in place.
+    lut = np.arange(256, dtype=np.int64)
+    lut -= min_level
+    lut *= 65535
+    lut += level_range // 2
+    lut //= level_range
+    np.clip(lut, 0, 65535, out=lut)
+    lut = lut.astype(np.uint16)
+
+    # Tile one LOD level at a time: each level is a 2x2 box average of the
+    # previous one, built right after that level is tiled, so only a single
+    # level of the pyramid is ever held in memory
+    lod_data = data
+    del data
+    total_size = 0
+    for lod in range(MAX_LOD_LEVELS if generate_lod else 1):
+        if lod > 0:
+            lod_data = box_downsample_2x(lod_data)
+            new_h, new_w = lod_data.shape
+            print(f"  LOD {lod} image: {new_w} x {new_h}")
+        total_size += process_lod_level_fast(lod_data, lod, tiles_x, tiles_y, width, height,
+                                             lut, output_dir, metadata, shard_rows, stub_uniform)
+    del lod_data
+
+    # Expose LOD 0 tiles in the root for backward compatibility
+    print("Linking backward-compatible flat tiles...")
+    total_size += link_flat_tiles(output_dir, metadata)
 
     # Save tile_index.json (new format)
     index_path = os.path.join(output_dir, "tile_index.json")
-    with open(index_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    save_json(index_path, metadata)
     print(f"  Saved tile index: {index_path}")
 
     # Save tileset.json (backward-compatible format)
@@ -176,27 +224,96 @@ def process_heightmap(input_path: str, output_dir: str, generate_lod: bool = Tru
         "tiles": metadata["tiles"]
     }
     tileset_path = os.path.join(output_dir, "tileset.json")
-    with open(tileset_path, 'w') as f:
-        json.dump(tileset, f, indent=2)
+    save_json(tileset_path, tileset)
     print(f"  Saved tileset (compat): {tileset_path}")
 
     print(f"\nComplete!")
     print(f"  Output directory: {output_dir}")
     print(f"  LOD levels: {MAX_LOD_LEVELS if generate_lod else 1}")
 
-    # Calculate approximate storage
-    total_size = 0
-    for root, dirs, files in os.walk(output_dir):
-        for file in files:
-            if file.endswith('.bin'):
-                total_size += os.path.getsize(os.path.join(root, file))
+    # Storage is tallied from the records written and flat tiles copied
+    # (hardlinked flat tiles add nothing)
     print(f"  Total tile size: {total_size / (1024 * 1024):.1f} MB")
 
 
+def save_json(path: str, data: dict) -> None:
+    """Save metadata as indented JSON (via orjson when available; same layout either way)"""
+    if HAS_ORJSON:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def box_downsample_2x(data: np.ndarray) -> np.ndarray:
+    """Halve a uint8 image by averaging 2x2 blocks (odd trailing rows/columns are dropped)"""
+    # Degenerate 1-pixel dimensions are duplicated so they stay 1 pixel wide
+    if data.shape[0] == 1:
+        data = np.repeat(data, 2, axis=0)
+    if data.shape[1] == 1:
+        data = np.repeat(data, 2, axis=1)
+    
+    h, w = data.shape[0] // 2, data.shape[1] // 2
+    if HAS_CV2:
+        # INTER_AREA at an exact 2x factor is the same rounded 2x2 mean, multi-threaded and SIMD
+        return cv2.resize(data[:h * 2, :w * 2], (w, h), interpolation=cv2.INTER_AREA)
+    kernel = _load_box_downsample_2x_kernel()
+    if kernel is not None:
+        downsampled = np.empty((h, w), dtype=np.uint8)
+        kernel(data, downsampled)
+        return downsampled
+    
+    # Sum the four samples in uint16 (max 4 * 255) and round-divide by 4,
+    # so the pyramid never leaves integer arithmetic
+    total = data[0:h * 2:2, 0:w * 2:2].astype(np.uint16)
+    total += data[1:h * 2:2, 0:w * 2:2]
+    total += data[0:h * 2:2, 1:w * 2:2]
+    total += data[1:h * 2:2, 1:w * 2:2]
+    total += 2
+    total >>= 2
+    return total.astype(np.uint8)
+
+
+_box_downsample_2x_kernel = None
+
+
+def _load_box_downsample_2x_kernel():
+    """Compile the numba fallback kernel on first use; None if numba is missing
+
+    numba is only needed when cv2 is not installed, and takes a noticeable time
+    to import, so it is imported here rather than at module load (pool workers
+    started with spawn or forkserver re-import this module and never downsample).
+    """
+    global _box_downsample_2x_kernel
+    if _box_downsample_2x_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _box_downsample_2x_kernel = False
+            return None
+
+        @njit(cache=True)
+        def kernel(src, out):
+            """Fused 2x2 rounded mean: one pass over src, no intermediate buffers"""
+            for i in range(out.shape[0]):
+                for j in range(out.shape[1]):
+                    total = (np.int32(src[2 * i, 2 * j]) + np.int32(src[2 * i + 1, 2 * j])
+                             + np.int32(src[2 * i, 2 * j + 1]) + np.int32(src[2 * i + 1, 2 * j + 1]))
+                    out[i, j] = np.uint8((total + 2) >> 2)
+
+        _box_downsample_2x_kernel = kernel
+    return _box_downsample_2x_kernel or None
+
+
 def process_lod_level_fast(lod_data: np.ndarray, lod: int, tiles_x: int, tiles_y: int,
-                          orig_width: int, orig_height: int, min_value: float, value_range: float,
-                          output_dir: str, metadata: dict) -> None:
-    """Process all tiles at a specific LOD level using pre-downsampled data"""
+                          orig_width: int, orig_height: int, lut: np.ndarray,
+                          output_dir: str, metadata: dict, shard_rows: bool = False,
+                          stub_uniform: bool = False) -> int:
+    """Process all tiles at a specific LOD level using pre-downsampled data
+
+    Returns the number of tile bytes written for the level.
+    """
     scale = 1 << lod  # 1, 2, 4, 8
     lod_height, lod_width = lod_data.shape
     
@@ -211,109 +328,319 @@ def process_lod_level_fast(lod_data: np.ndarray, lod: int, tiles_x: int, tiles_y
     
     processed = 0
     total_tiles = effective_tiles_x * effective_tiles_y
-    lod_dir = os.path.join(output_dir, f"lod{lod}")
+    # Path prefixes are built once; per tile only the file name is formatted
+    lod_dir_sep = os.path.join(output_dir, f"lod{lod}") + os.sep
+    lod_file_prefix = f"lod{lod}/"
+    lod_tiles = metadata["lod_tiles"][str(lod)]
+    
+    # Tile sizes only shrink on the right/bottom edge, so compute them once
+    # per column and row instead of per tile
+    tile_widths = [min(tile_size_at_lod, lod_width - tx * tile_size_at_lod) for tx in range(effective_tiles_x)]
+    tile_heights = [min(tile_size_at_lod, lod_height - ty * tile_size_at_lod) for ty in range(effective_tiles_y)]
+    orig_widths = [min(TILE_SIZE * scale, orig_width - tx * TILE_SIZE) for tx in range(effective_tiles_x)]
+    orig_heights = [min(TILE_SIZE * scale, orig_height - ty * TILE_SIZE) for ty in range(effective_tiles_y)]
     
+    # One job per tile, or per tile row when the row goes to a single shard
+    jobs = []
+    row_tile_metadata = []
+    level_bytes = 0
     for ty in range(effective_tiles_y):
+        # Region in LOD image and in original source coordinates
+        src_y = ty * tile_size_at_lod
+        tile_h = tile_heights[ty]
+        orig_src_y = ty * TILE_SIZE
+        orig_src_h = orig_heights[ty]
+        
+        shard_file = f"row_{ty}.bin" if shard_rows else None
+        shard_offset = 0
+        row_tiles = []
+        row_metadata = []
+        
         for tx in range(effective_tiles_x):
             tile_key = f"{tx}_{ty}"
+            fname = f"tile_{tile_key}.bin"
+            tile_w = tile_widths[tx]
             
-            # Calculate region in LOD image
-            src_x = tx * tile_size_at_lod
-            src_y = ty * tile_size_at_lod
-            tile_w = min(tile_size_at_lod, lod_width - src_x)
-            tile_h = min(tile_size_at_lod, lod_height - src_y)
-            
-            # Skip if region is invalid
-            if tile_w <= 0 or tile_h <= 0:
-                continue
-            
-            # Extract tile region directly from pre-downsampled image
-            tile_data = lod_data[src_y:src_y + tile_h, src_x:src_x + tile_w]
-            
-            # Normalize to 0-1 based on global min/max
-            normalized = (tile_data - min_value) / value_range
-            
-            # Convert to 16-bit unsigned (0-65535)
-            height_16bit = (normalized * 65535.0).clip(0, 65535).astype(np.uint16)
-            
-            # Save tile
-            tile_path = os.path.join(lod_dir, f"tile_{tile_key}.bin")
-            save_tile_binary(tile_path, height_16bit, tile_w, tile_h)
-            
-            # Calculate original source coordinates
-            orig_src_x = tx * TILE_SIZE
-            orig_src_y = ty * TILE_SIZE
-            orig_src_w = min(TILE_SIZE * scale, orig_width - orig_src_x)
-            orig_src_h = min(TILE_SIZE * scale, orig_height - orig_src_y)
+            if shard_rows:
+                row_tiles.append((tx * tile_size_at_lod, tile_w))
+            else:
+                jobs.append((ty, tx, lod_dir_sep + fname, tx * tile_size_at_lod, src_y, tile_w, tile_h))
+            tile_length = TILE_HEADER_SIZE + tile_w * tile_h * 2
+            level_bytes += tile_length
             
             # Store tile metadata
-            metadata["lod_tiles"][str(lod)][tile_key] = {
-                "file": f"lod{lod}/tile_{tile_key}.bin",
+            tile = {
+                "file": lod_file_prefix + (shard_file or fname),
                 "width": tile_w,
                 "height": tile_h,
-                "src_x": orig_src_x,
+                "src_x": tx * TILE_SIZE,
                 "src_y": orig_src_y,
-                "src_w": orig_src_w,
+                "src_w": orig_widths[tx],
                 "src_h": orig_src_h,
                 "lod": lod
             }
+            if shard_rows:
+                # Records are appended in column order, so offsets follow from the sizes
+                tile["offset"] = shard_offset
+                tile["length"] = tile_length
+                shard_offset += tile_length
+            lod_tiles[tile_key] = tile
+            row_metadata.append(tile)
+        
+        if shard_rows:
+            jobs.append((ty, lod_dir_sep + shard_file, src_y, tile_h, row_tiles))
+        row_tile_metadata.append(row_metadata)
+    
+    if shard_rows:
+        for ty, uniform_values in run_tile_jobs(lod_data, jobs, _write_tile_row, total_tiles,
+                                                lut, stub_uniform):
+            # Uniform tiles were written as stubs: flag them and shift the
+            # shard offsets of every record that follows
+            if any(value is not None for value in uniform_values):
+                shard_offset = 0
+                for tile, value in zip(row_tile_metadata[ty], uniform_values):
+                    if value is not None:
+                        level_bytes -= _mark_uniform_tile(tile, value)
+                        tile["length"] = UNIFORM_TILE_SIZE
+                    tile["offset"] = shard_offset
+                    shard_offset += tile["length"]
+            
+            processed += len(uniform_values)
+            print(f"  LOD {lod}: Processed {processed}/{total_tiles} tiles ({100.0 * processed / total_tiles:.1f}%)")
+    else:
+        for ty, tx, value in run_tile_jobs(lod_data, jobs, _write_tile, total_tiles,
+                                           lut, stub_uniform):
+            if value is not None:
+                level_bytes -= _mark_uniform_tile(row_tile_metadata[ty][tx], value)
             
             processed += 1
             if processed % 200 == 0 or processed == total_tiles:
                 print(f"  LOD {lod}: Processed {processed}/{total_tiles} tiles ({100.0 * processed / total_tiles:.1f}%)")
+    
+    return level_bytes
 
 
-def process_flat_tiles(data: np.ndarray, tiles_x: int, tiles_y: int,
-                      width: int, height: int, min_value: float, value_range: float,
-                      output_dir: str, metadata: dict) -> None:
-    """Process tiles in flat structure for backward compatibility"""
-    processed = 0
-    total_tiles = tiles_x * tiles_y
+def _mark_uniform_tile(tile: dict, value: int) -> int:
+    """Flag a tile written as a uniform stub; returns the bytes saved versus a full record"""
+    tile["constant"] = True
+    tile["value"] = value
+    return TILE_HEADER_SIZE + tile["width"] * tile["height"] * 2 - UNIFORM_TILE_SIZE
+
+
+def link_flat_tiles(output_dir: str, metadata: dict) -> int:
+    """Expose LOD 0 tiles in the flat root layout for backward compatibility
+
+    Flat tiles are byte-identical to LOD 0 tiles, so they are hardlinked rather
+    than regenerated (copied on filesystems without hardlink support). Sharded
+    LOD 0 tiles have no file of their own; their flat entries point into the
+    lod0 row shards instead. Returns the number of bytes copied.
+    """
+    lod0_tiles = metadata["lod_tiles"]["0"]
+    total_tiles = len(lod0_tiles)
+    output_dir_sep = os.path.join(output_dir, "")
+    flat_tiles = metadata["tiles"]
+    copied_bytes = 0
     
-    for ty in range(tiles_y):
-        for tx in range(tiles_x):
-            tile_key = f"{tx}_{ty}"
-            
-            # Calculate source region
-            src_x = tx * TILE_SIZE
-            src_y = ty * TILE_SIZE
-            tile_w = min(TILE_SIZE, width - src_x)
-            tile_h = min(TILE_SIZE, height - src_y)
-            
-            # Extract tile region
-            tile_data = data[src_y:src_y + tile_h, src_x:src_x + tile_w]
-            
-            # Normalize to 0-1 based on global min/max
-            normalized = (tile_data - min_value) / value_range
-            
-            # Convert to 16-bit unsigned (0-65535)
-            height_16bit = (normalized * 65535.0).clip(0, 65535).astype(np.uint16)
-            
-            # Save tile
-            tile_path = os.path.join(output_dir, f"tile_{tile_key}.bin")
-            save_tile_binary(tile_path, height_16bit, tile_w, tile_h)
-            
-            # Store tile metadata
-            metadata["tiles"][tile_key] = {
-                "file": f"tile_{tile_key}.bin",
-                "width": tile_w,
-                "height": tile_h,
-                "src_x": src_x,
-                "src_y": src_y
+    for processed, (tile_key, tile) in enumerate(lod0_tiles.items(), 1):
+        if "offset" in tile:
+            flat_tiles[tile_key] = {
+                "file": tile["file"],
+                "offset": tile["offset"],
+                "length": tile["length"],
+                "width": tile["width"],
+                "height": tile["height"],
+                "src_x": tile["src_x"],
+                "src_y": tile["src_y"]
             }
+        else:
+            flat_file = f"tile_{tile_key}.bin"
+            copied_bytes += _link_or_copy(output_dir_sep + tile["file"], output_dir_sep + flat_file)
             
-            processed += 1
-            if processed % 200 == 0 or processed == total_tiles:
-                print(f"  Flat tiles: Processed {processed}/{total_tiles} tiles ({100.0 * processed / total_tiles:.1f}%)")
+            flat_tiles[tile_key] = {
+                "file": flat_file,
+                "width": tile["width"],
+                "height": tile["height"],
+                "src_x": tile["src_x"],
+                "src_y": tile["src_y"]
+            }
+        
+        if tile.get("constant"):
+            flat_tiles[tile_key]["constant"] = True
+            flat_tiles[tile_key]["value"] = tile["value"]
+        
+        if processed % 200 == 0 or processed == total_tiles:
+            print(f"  Flat tiles: Linked {processed}/{total_tiles} tiles ({100.0 * processed / total_tiles:.1f}%)")
+    
+    return copied_bytes
+
+
+def _link_or_copy(src: str, dst: str) -> int:
+    """Hardlink src to dst, replacing any existing dst; copy if linking is unsupported
+
+    Returns the number of bytes copied (0 when hardlinked).
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+        return os.path.getsize(dst)
+    return 0
+
+
+def run_tile_jobs(data: np.ndarray, jobs: list, worker, tile_count: int,
+                  lut: np.ndarray, stub_uniform: bool = False):
+    """Run worker over every job, yielding its results as jobs finish
+
+    Grids of at least PARALLEL_MIN_TILES tiles are spread over a process pool
+    so tasks only carry paths and regions; the pool never has more processes
+    than there are jobs. Under fork, workers inherit the level array
+    copy-on-write. Other start methods (spawn is the default on macOS and
+    Windows) would unpickle a private copy of the level per worker, so the
+    level is instead placed once in a SharedMemory block that every worker
+    attaches to by name.
+    """
+    processes = min(os.cpu_count() or 1, len(jobs))
+    if tile_count < PARALLEL_MIN_TILES or processes < 2:
+        _init_tile_worker(data, lut, stub_uniform)
+        for job in jobs:
+            yield worker(job)
+        return
+
+    # Small chunks keep the pool balanced when some tiles finish early (stubs)
+    chunksize = max(1, min(16, len(jobs) // (4 * processes)))
+
+    if get_start_method() == "fork":
+        initargs = (data, lut, stub_uniform)
+        with Pool(processes, initializer=_init_tile_worker, initargs=initargs) as pool:
+            yield from pool.imap_unordered(worker, jobs, chunksize=chunksize)
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+    try:
+        shared = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+        shared[...] = data
+        del shared
+        initargs = (None, lut, stub_uniform, (shm.name, data.shape))
+        with Pool(processes, initializer=_init_tile_worker, initargs=initargs) as pool:
+            yield from pool.imap_unordered(worker, jobs, chunksize=chunksize)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _init_tile_worker(data: np.ndarray, lut: np.ndarray, stub_uniform: bool,
+                      shared: tuple = None) -> None:
+    """Stash the shared tile source in module globals for the tile workers
+
+    When shared is given, data is None and shared holds the (name, shape) of
+    the SharedMemory block holding the level, which is attached without a copy.
+    """
+    global _worker_data, _worker_lut, _worker_stub_uniform, _worker_out16, _worker_shm
+    if shared is not None:
+        shm_name, shape = shared
+        _worker_shm = shared_memory.SharedMemory(name=shm_name)
+        data = np.ndarray(shape, dtype=np.uint8, buffer=_worker_shm.buf)
+    _worker_data = data
+    _worker_lut = lut
+    _worker_stub_uniform = stub_uniform
+    # Reused by every tile this worker writes, so the quantized output needs no
+    # per-tile allocation (np.take still widens the uint8 indices to an intp
+    # temporary, 8 bytes per pixel)
+    _worker_out16 = np.empty(TILE_SIZE * TILE_SIZE, dtype=np.uint16)
+
+
+def _write_tile(job: tuple) -> tuple:
+    """Normalize, quantize and save a single tile to its own file
+
+    Returns (row, column, value) where value is the height written as a
+    uniform stub, or None for a full tile.
+    """
+    ty, tx, tile_path, src_x, src_y, tile_w, tile_h = job
+    tile_data = _worker_data[src_y:src_y + tile_h, src_x:src_x + tile_w]
+    
+    fd = os.open(tile_path, TILE_OPEN_FLAGS, 0o644)
+    try:
+        return ty, tx, _quantize_tile_record(fd, tile_data)
+    finally:
+        os.close(fd)
+
+
+def _write_tile_row(job: tuple) -> tuple:
+    """Normalize, quantize and save one row of tiles back to back into a shard
+
+    Returns (row, values) where values holds, per tile, the height written
+    as a uniform stub, or None for a full tile.
+    """
+    ty, shard_path, src_y, tile_h, row_tiles = job
+    row_data = _worker_data[src_y:src_y + tile_h]
+    
+    fd = os.open(shard_path, TILE_OPEN_FLAGS, 0o644)
+    try:
+        return ty, [_quantize_tile_record(fd, row_data[:, src_x:src_x + tile_w])
+                    for src_x, tile_w in row_tiles]
+    finally:
+        os.close(fd)
+
+
+def _quantize_tile_record(fd: int, tile_data: np.ndarray):
+    """Write one tile's record at the current position of fd
+
+    Returns the tile's height value if it was written as a uniform stub, else None.
+    """
+    tile_h, tile_w = tile_data.shape
+    
+    if _worker_stub_uniform:
+        level = tile_data.min()
+        if level == tile_data.max():
+            value = int(_worker_lut[level])
+            write_uniform_record(fd, tile_w, tile_h, value)
+            return value
+    
+    # Normalize and quantize to 16-bit (0-65535) with a single table lookup.
+    # Taking the output as a prefix of a flat buffer keeps it C-contiguous for
+    # edge tiles too, so the write below never needs a hidden copy.
+    # mode='clip' lets np.take fill out directly instead of buffering it
+    # (uint8 indices into a 256-entry table can never be out of range).
+    height_16bit = _worker_out16[:tile_h * tile_w].reshape(tile_h, tile_w)
+    assert height_16bit.flags['C_CONTIGUOUS']
+    np.take(_worker_lut, tile_data, out=height_16bit, mode='clip')
+    
+    write_tile_record(fd, height_16bit, tile_w, tile_h)
+    return None
 
 
 def save_tile_binary(path: str, data: np.ndarray, width: int, height: int) -> None:
     """Save tile as binary file with header"""
-    with open(path, 'wb') as f:
-        # Write header (little-endian)
-        f.write(struct.pack('<HH', width, height))
-        # Write heightmap data (little-endian)
-        f.write(data.tobytes())
+    fd = os.open(path, TILE_OPEN_FLAGS, 0o644)
+    try:
+        write_tile_record(fd, data, width, height)
+    finally:
+        os.close(fd)
+
+
+def write_uniform_record(fd: int, width: int, height: int, value: int) -> None:
+    """Write one constant-tile stub record (little-endian) at the current position of fd"""
+    os.write(fd, struct.pack('<HHHH', UNIFORM_TILE_MARKER, width, height, value))
+
+
+def write_tile_record(fd: int, data: np.ndarray, width: int, height: int) -> None:
+    """Write one tile record (header + heightmap data) at the current position of fd"""
+    # Header (little-endian) followed by heightmap data (little-endian), sent
+    # straight from the array buffer with no Python file object in between
+    buffers = [memoryview(struct.pack('<HH', width, height)), memoryview(data).cast('B')]
+    while buffers:
+        # writev sends header and payload in one scatter-gather syscall. Regular
+        # files take it all at once; resume correctly after a short write anyway.
+        if hasattr(os, "writev"):
+            written = os.writev(fd, buffers)
+        else:
+            written = os.write(fd, buffers[0])
+        while buffers and written >= len(buffers[0]):
+            written -= len(buffers.pop(0))
+        if buffers:
+            buffers[0] = buffers[0][written:]
 
 
 def main():
@@ -324,6 +651,8 @@ def main():
 
     # Parse arguments
     generate_lod = True
+    shard_rows = False
+    stub_uniform = False
     input_path = default_input
     output_dir = default_output
     
@@ -333,6 +662,10 @@ def main():
     for arg in args:
         if arg == "--no-lod":
             generate_lod = False
+        elif arg == "--shard-rows":
+            shard_rows = True
+        elif arg == "--stub-uniform":
+            stub_uniform = True
         elif not arg.startswith("--"):
             non_flag_args.append(arg)
     
@@ -341,7 +674,7 @@ def main():
     if len(non_flag_args) >= 2:
         output_dir = non_flag_args[1]
 
-    process_heightmap(input_path, output_dir, generate_lod)
+    process_heightmap(input_path, output_dir, generate_lod, shard_rows, stub_uniform)
 
 
 if __name__ == "__main__":